@@ -1,13 +1,19 @@
 import streamlit as st
 import random
-import pandas as pd
-import altair as alt
+import numpy as np
 import json
+from array import array
+from collections import deque
+from string import Template
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, NamedTuple, Tuple
+
+if TYPE_CHECKING:
+    import altair as alt
+    import pandas as pd
 
 # --- CUSTOM CSS (TECHNO/CYBERPUNK THEME - HIGH CONTRAST LIGHT) ---
-st.markdown("""
+CSS = """
 <style>
     @import url('https://fonts.googleapis.com/css2?family=Rajdhani:wght@400;700&display=swap');
 
@@ -82,8 +88,19 @@ st.markdown("""
     .st-emotion-cache-16txtl3 {
         background-color: #ffffff;
     }
-    .sidebar .stProgress > div > div > div > div {
+    .metric-row {
+        margin-bottom: 0.75rem;
+    }
+    .metric-row .metric-bar {
+        background-color: #d1d9e6;
+        border-radius: 4px;
+        height: 0.5rem;
+        margin: 4px 0;
+        overflow: hidden;
+    }
+    .metric-row .bar {
         background: linear-gradient(90deg, #00ffff, #ff00ff);
+        height: 100%;
     }
     
     /* Headings and text for readability */
@@ -106,12 +123,20 @@ st.markdown("""
         border: 1px solid #d1d9e6;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _inject_css():
+    """Emits the theme stylesheet; cached so reruns replay it instead of rebuilding it."""
+    st.markdown(CSS, unsafe_allow_html=True)
+    return True
+
+_inject_css()
 
 # --- DATA MODELS ---
 # Using dataclasses for structured, readable, and maintainable data definitions.
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActionCard:
     id: str
     name: str
@@ -123,13 +148,16 @@ class ActionCard:
     side_effect_risk: float
     safeguard_reduction: float
     tooltip: str
+    side_effect_weight: float = field(init=False)  # side_effect_risk pre-scaled to security points
+
+    def __post_init__(self):
+        object.__setattr__(self, 'side_effect_weight', self.side_effect_risk * 20)
 
-@dataclass
-class Advisor:
+class Advisor(NamedTuple):
     name: str
     text: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Scenario:
     id: str
     title: str
@@ -139,6 +167,9 @@ class Scenario:
     action_cards: List[ActionCard]
     immediate_text: str
     delayed_text: str
+    report_part: str = field(default="")
+    mission_part: str = field(default="")
+    action_cards_by_id: Dict[str, ActionCard] = field(default_factory=dict)
 
 # --- GAME CONTENT & CONFIGURATION ---
 # Centralized place for all game scenarios and initial settings.
@@ -147,12 +178,14 @@ class Scenario:
 def load_json_data(filepath: str) -> Dict:
     """Loads any JSON file."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # Read the whole file in one call and parse it in a single pass
+        with open(filepath, 'rb') as f:
+            return json.loads(f.read())
     except FileNotFoundError:
         st.error(f"Hata: {filepath} dosyası bulunamadı. Lütfen dosyanın mevcut olduğundan emin olun.")
         return None
 
+@st.cache_resource
 def get_scenarios() -> Dict[str, Scenario]:
     """Parses scenario data from the loaded JSON into Scenario objects."""
     scenarios_data = load_json_data('scenarios.json')
@@ -163,21 +196,85 @@ def get_scenarios() -> Dict[str, Scenario]:
     for key, data in scenarios_data.items():
         # JSON'daki "action_cards" gibi anahtarları kontrol et
         if 'action_cards' in data and 'advisors' in data:
+            story = data.get('story', '')
+            # Split the story into report/mission halves once instead of on every render
+            story_parts = story.split("**Görev**:")
+            if len(story_parts) == 2:
+                report_part, mission_part = story_parts
+            else:
+                report_part, mission_part = story, ""
+
+            action_cards = [ActionCard(**card) for card in data['action_cards']]
             scenarios[key] = Scenario(
                 id=key,
                 title=data.get('title', 'Başlıksız Senaryo'),
                 icon=data.get('icon', '❓'),
-                story=data.get('story', ''),
+                story=story,
                 advisors=[Advisor(**advisor) for advisor in data['advisors']],
-                action_cards=[ActionCard(**card) for card in data['action_cards']],
+                action_cards=action_cards,
                 immediate_text=data.get('immediate_text', ''),
-                delayed_text=data.get('delayed_text', '')
+                delayed_text=data.get('delayed_text', ''),
+                report_part=report_part,
+                mission_part=mission_part,
+                action_cards_by_id={card.id: card for card in action_cards}
             )
     return scenarios
 
 # --- GAME LOGIC ---
 # Core functions that manage game state and calculate outcomes.
 
+METRIC_KEYS = ('security', 'freedom', 'public_trust', 'resilience', 'fatigue')
+SECURITY, FREEDOM, TRUST, RESILIENCE, FATIGUE = range(len(METRIC_KEYS))  # Indices into the metrics vector
+METRIC_LABELS = ('Güvenlik', 'Özgürlük', 'Kamu Güveni', 'Dayanıklılık', 'Uyum Yorgunluğu')
+
+RNG_POOL_SIZE = 64
+
+def _draw_rng_pool() -> List[float]:
+    """Draws a batch of uniform [0, 1) samples from NumPy's PCG64 generator."""
+    return np.random.default_rng().uniform(0, 1, size=RNG_POOL_SIZE).tolist()
+
+def draw_uniform(low: float = 0.0, high: float = 1.0) -> float:
+    """Returns a uniform sample in [low, high) from the session's prefetched pool, refilling it when exhausted."""
+    if not st.session_state.rng_pool:
+        st.session_state.rng_pool = _draw_rng_pool()
+    return low + (high - low) * st.session_state.rng_pool.pop()
+
+def metrics_vector(values: Dict) -> np.ndarray:
+    """Packs a metric-name -> value mapping into a float32 vector in METRIC_KEYS order."""
+    return np.array([values[key] for key in METRIC_KEYS], dtype=np.float32)
+
+def metrics_dict(vector: np.ndarray) -> Dict[str, float]:
+    """Unpacks a metrics vector into a metric-name -> value mapping."""
+    return dict(zip(METRIC_KEYS, vector.tolist()))
+
+def apply_metric_deltas(current: np.ndarray, deltas) -> np.ndarray:
+    """Adds per-metric deltas (in METRIC_KEYS order) to a metrics vector and clamps all metrics to 0-100 in one pass."""
+    return np.clip(current + np.asarray(deltas, dtype=np.float32), 0.0, 100.0)
+
+def record_history(metrics: np.ndarray):
+    """Appends a metrics vector to the per-metric crisis history columns."""
+    for key, value in zip(METRIC_KEYS, metrics.tolist()):
+        st.session_state.crisis_history[key].append(value)
+
+def history_snapshot(index: int) -> np.ndarray:
+    """Returns the metrics vector recorded at the given crisis history index."""
+    return np.array([st.session_state.crisis_history[key][index] for key in METRIC_KEYS], dtype=np.float32)
+
+def _reset_gameplay_state(settings: Dict):
+    """Resets only the mutable per-game fields; config, balance parameters and scenarios are left untouched."""
+    st.session_state.screen = 'start_game'
+    st.session_state.metrics = metrics_vector(settings.get('metrics', {}))
+    st.session_state.budget = settings.get('budget', 100)
+    st.session_state.human_resources = settings.get('hr', 50)
+    st.session_state.max_crises = settings.get('max_crises', 3)
+    st.session_state.crisis_history = {key: array('f') for key in METRIC_KEYS}  # One float32 column per metric
+    st.session_state.news_ticker = deque(["Oyun başladı. Ülke durumu stabil."], maxlen=5)
+    st.session_state.current_crisis_index = 0
+    st.session_state.crisis_sequence = []
+    st.session_state.selected_scenario_id = None
+    st.session_state.decision = {}
+    st.session_state.results = None
+
 def initialize_game_state():
     """Sets up the session state for a new game if it doesn't exist."""
     if 'game_initialized' not in st.session_state:
@@ -188,56 +285,59 @@ def initialize_game_state():
         settings = config.get('initial_settings', {})
         
         st.session_state.game_initialized = True
-        st.session_state.screen = 'start_game'
-        st.session_state.metrics = settings.get('metrics', {}).copy()
-        st.session_state.budget = settings.get('budget', 100)
-        st.session_state.human_resources = settings.get('hr', 50)
-        st.session_state.max_crises = settings.get('max_crises', 3)
-        st.session_state.crisis_history = []
-        st.session_state.news_ticker = ["Oyun başladı. Ülke durumu stabil."]
-        st.session_state.current_crisis_index = 0
-        st.session_state.crisis_sequence = []
-        st.session_state.selected_scenario_id = None
-        st.session_state.decision = {}
-        st.session_state.results = None
+        _reset_gameplay_state(settings)
         st.session_state.config = config # Store config in session state
+        st.session_state.rng_pool = _draw_rng_pool()
+
+        # Unpack balance parameters once so calculate_effects doesn't re-index config per decision
+        balance = config['game_balance']
+        st.session_state.balance_tuple = (
+            balance['THREAT_SEVERITY'],
+            tuple(balance['RANDOM_FACTOR_RANGE']),
+            balance['SCOPE_MULTIPLIERS'],
+            balance['DURATION_MULTIPLIERS'],
+            balance['SAFEGUARD_QUALITY_PER_ITEM'],
+            balance['TRUST_BOOST_FOR_TRANSPARENCY'],
+            balance['FATIGUE_PER_DURATION'],
+        )
 
 def reset_game():
-    """Resets the game to its initial state."""
-    st.session_state.game_initialized = False
-    initialize_game_state()
+    """Resets the game to its initial state, reusing the already-loaded config and scenario catalog."""
+    _reset_gameplay_state(st.session_state.config.get('initial_settings', {}))
     st.rerun()
 
 def add_news(headline):
     """Adds a new headline to the news ticker."""
-    st.session_state.news_ticker.insert(0, headline)
-    if len(st.session_state.news_ticker) > 5:
-        st.session_state.news_ticker.pop()
+    st.session_state.news_ticker.appendleft(headline)
+
+def _effects_kernel(security_effect: float, side_effect_weight: float, base_freedom_cost: float, safeguard_reduction: float,
+                    scope_multiplier: float, duration_multiplier: float, safeguard_quality: float,
+                    speed_is_slow: bool, has_transparency: bool,
+                    threat_severity: float, random_factor: float, trust_boost: float, fatigue_per_duration: float) -> Tuple[float, ...]:
+    """Pure numeric core of calculate_effects; takes primitives only and returns the raw metric changes
+    (security, freedom cost, public trust, resilience, fatigue)."""
+    security_change = (threat_severity * security_effect / 100) - (side_effect_weight * random_factor)
+    freedom_cost = base_freedom_cost * scope_multiplier * duration_multiplier * (1 - safeguard_quality * safeguard_reduction)
+    public_trust_change = (trust_boost if has_transparency else 0) - (freedom_cost * 0.5)
+    resilience_change = (security_effect * safeguard_quality / 2) if speed_is_slow else 5
+    fatigue_change = duration_multiplier * fatigue_per_duration
+    return security_change, freedom_cost, public_trust_change, resilience_change, fatigue_change
 
 def calculate_effects(action: ActionCard, scope: str, duration: str, safeguards: List[str]) -> Dict:
     """Calculates the effects of a player's decision on the game metrics."""
-    # --- Load balance parameters from config ---
-    balance = st.session_state.config['game_balance']
-    
-    THREAT_SEVERITY = balance['THREAT_SEVERITY']
-    RANDOM_FACTOR_RANGE = tuple(balance['RANDOM_FACTOR_RANGE'])
-    SCOPE_MULTIPLIERS = balance['SCOPE_MULTIPLIERS']
-    DURATION_MULTIPLIERS = balance['DURATION_MULTIPLIERS']
-    SAFEGUARD_QUALITY_PER_ITEM = balance['SAFEGUARD_QUALITY_PER_ITEM']
-    TRUST_BOOST_FOR_TRANSPARENCY = balance['TRUST_BOOST_FOR_TRANSPARENCY']
-    FATIGUE_PER_DURATION = balance['FATIGUE_PER_DURATION']
+    # --- Load balance parameters (precomputed in initialize_game_state) ---
+    (THREAT_SEVERITY, RANDOM_FACTOR_RANGE, SCOPE_MULTIPLIERS, DURATION_MULTIPLIERS,
+     SAFEGUARD_QUALITY_PER_ITEM, TRUST_BOOST_FOR_TRANSPARENCY, FATIGUE_PER_DURATION) = st.session_state.balance_tuple
 
     # --- Calculation logic (unchanged, but now uses variables from config) ---
-    random_factor = random.uniform(*RANDOM_FACTOR_RANGE)
-    scope_multiplier = SCOPE_MULTIPLIERS[scope]
-    duration_multiplier = DURATION_MULTIPLIERS[duration]
-    safeguard_quality = len(safeguards) * SAFEGUARD_QUALITY_PER_ITEM
-
-    security_change = (THREAT_SEVERITY * action.security_effect / 100) - (action.side_effect_risk * random_factor * 20)
-    freedom_cost = action.freedom_cost * scope_multiplier * duration_multiplier * (1 - safeguard_quality * action.safeguard_reduction)
-    public_trust_change = (TRUST_BOOST_FOR_TRANSPARENCY if 'transparency' in safeguards else 0) - (freedom_cost * 0.5)
-    resilience_change = (action.security_effect * safeguard_quality / 2) if action.speed == 'slow' else 5
-    fatigue_change = duration_multiplier * FATIGUE_PER_DURATION[scope]
+    # Side effects only matter for risky actions, so skip the draw when the risk is zero
+    random_factor = draw_uniform(*RANDOM_FACTOR_RANGE) if action.side_effect_risk else 0.0
+    security_change, freedom_cost, public_trust_change, resilience_change, fatigue_change = _effects_kernel(
+        action.security_effect, action.side_effect_weight, action.freedom_cost, action.safeguard_reduction,
+        SCOPE_MULTIPLIERS[scope], DURATION_MULTIPLIERS[duration], len(safeguards) * SAFEGUARD_QUALITY_PER_ITEM,
+        action.speed == 'slow', 'transparency' in safeguards,
+        THREAT_SEVERITY, random_factor, TRUST_BOOST_FOR_TRANSPARENCY, FATIGUE_PER_DURATION[scope]
+    )
 
     # --- News Ticker Logic ---
     if security_change > 15:
@@ -254,11 +354,7 @@ def calculate_effects(action: ActionCard, scope: str, duration: str, safeguards:
         counter_factual = 'Bu, orantılı bir seçimdi; güvenceler fark yarattı.'
 
     return {
-        'security': min(100, max(0, st.session_state.metrics['security'] + security_change)),
-        'freedom': min(100, max(0, st.session_state.metrics['freedom'] - freedom_cost)),
-        'public_trust': min(100, max(0, st.session_state.metrics['public_trust'] + public_trust_change)),
-        'resilience': min(100, max(0, st.session_state.metrics['resilience'] + resilience_change)),
-        'fatigue': min(100, max(0, st.session_state.metrics['fatigue'] + fatigue_change)),
+        **metrics_dict(apply_metric_deltas(st.session_state.metrics, [security_change, -freedom_cost, public_trust_change, resilience_change, fatigue_change])),
         'counter_factual': counter_factual,
         'budget': st.session_state.budget - action.cost,
         'human_resources': st.session_state.human_resources - action.hr_cost
@@ -275,11 +371,7 @@ def calculate_skip_turn_effects():
     counter_factual = "Kaynaklarınızı daha verimli kullanmış olsaydınız, bu krize müdahale edebilir ve daha büyük zararları önleyebilirdiniz."
 
     return {
-        'security': min(100, max(0, st.session_state.metrics['security'] + security_penalty)),
-        'freedom': st.session_state.metrics['freedom'],
-        'public_trust': min(100, max(0, st.session_state.metrics['public_trust'] + trust_penalty)),
-        'resilience': min(100, max(0, st.session_state.metrics['resilience'] + resilience_penalty)),
-        'fatigue': min(100, max(0, st.session_state.metrics['fatigue'] + fatigue_increase)),
+        **metrics_dict(apply_metric_deltas(st.session_state.metrics, [security_penalty, 0, trust_penalty, resilience_penalty, fatigue_increase])),
         'counter_factual': counter_factual,
         'budget': st.session_state.budget,
         'human_resources': st.session_state.human_resources
@@ -288,33 +380,49 @@ def calculate_skip_turn_effects():
 # --- UI COMPONENTS ---
 # Reusable functions for rendering parts of the UI.
 
+# Precompiled HTML fragments for the repeated card markup
+_CRISIS_CARD_TPL = Template('<div class="crisis-card">$body</div>')
+_MISSION_TPL = Template('<div class="crisis-card" style="border-left: 5px solid #ff00ff;"><h4>Görev</h4><hr><p>$mission</p></div>')
+_ADVISOR_TPL = Template('<div class="crisis-card"><h5>$name</h5><hr><p>$text</p></div>')
+_GUIDANCE_TPL = Template('<div class="crisis-card" style="background-color: #e8f0fe; border-left: 5px solid #00ffff;">💡 <strong>Rehber</strong>: $text</div>')
+_NEWS_ITEM_TPL = Template('<p>• $item</p>')
+
+# Sidebar dashboard layout: (label, initial_settings key for the max or None for a 0-100 scale).
+# Rows are budget, human resources, then the metrics vector in METRIC_KEYS order.
+_METRIC_LAYOUT = (
+    ('Bütçe', 'budget'),
+    ('İnsan Kaynağı', 'hr'),
+    ('Güvenlik', None),
+    ('Özgürlük', None),
+    ('Kamu Güveni', None),
+    ('Dayanıklılık', None),
+    ('Uyum Yorgunluğu', None),
+)
+
 def display_metrics_sidebar():
     """Displays the main status dashboard in the sidebar."""
     st.sidebar.header("📊 Durum Panosu")
     
     settings = st.session_state.config['initial_settings']
-    INITIAL_BUDGET = settings['budget']
-    INITIAL_HR = settings['hr']
-    
-    metrics_data = [
-        ('Bütçe', st.session_state.budget, INITIAL_BUDGET),
-        ('İnsan Kaynağı', st.session_state.human_resources, INITIAL_HR),
-        ('Güvenlik', st.session_state.metrics['security'], 100),
-        ('Özgürlük', st.session_state.metrics['freedom'], 100),
-        ('Kamu Güveni', st.session_state.metrics['public_trust'], 100),
-        ('Dayanıklılık', st.session_state.metrics['resilience'], 100),
-        ('Uyum Yorgunluğu', st.session_state.metrics['fatigue'], 100)
-    ]
-    for name, value, max_value in metrics_data:
-        st.sidebar.markdown(f"**{name}**")
-        st.sidebar.progress(min(max(value / max_value, 0), 1))
-        st.sidebar.markdown(f"<div style='text-align: right;'>{value:.1f} / {max_value}</div>", unsafe_allow_html=True)
+
+    values = np.concatenate(([st.session_state.budget, st.session_state.human_resources], st.session_state.metrics))
+    maxes = np.array([settings[max_key] if max_key else 100 for _, max_key in _METRIC_LAYOUT], dtype=float)
+    progress = np.clip(values / maxes, 0, 1)
+
+    # One HTML block with CSS progress bars instead of three widgets per metric
+    rows_html = "".join(
+        f"<div class='metric-row'><strong>{name}</strong>"
+        f"<div class='metric-bar'><div class='bar' style='width: {fraction * 100:.1f}%;'></div></div>"
+        f"<div style='text-align: right;'>{value:.1f} / {max_value:g}</div></div>"
+        for (name, _), value, max_value, fraction in zip(_METRIC_LAYOUT, values, maxes, progress)
+    )
+    st.sidebar.markdown(rows_html, unsafe_allow_html=True)
     
     st.sidebar.write("---")
     if st.session_state.screen not in ['start_game', 'game_end']:
         if st.sidebar.button("Oyunu Bitir"):
             if not st.session_state.results:
-                st.session_state.results = st.session_state.metrics
+                st.session_state.results = metrics_dict(st.session_state.metrics)
             st.session_state.screen = 'game_end'
             st.rerun()
 
@@ -332,23 +440,95 @@ def display_help_guide():
 
 def display_guidance(text: str):
     """Displays a styled guidance box."""
-    st.markdown(f"""
-    <div class="crisis-card" style="background-color: #e8f0fe; border-left: 5px solid #00ffff;">
-        💡 <strong>Rehber</strong>: {text}
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_GUIDANCE_TPL.substitute(text=text), unsafe_allow_html=True)
 
 def display_news_ticker():
     """Displays the news ticker with recent headlines."""
-    st.markdown('<div class="news-ticker"><h4>Haber Akışı</h4>', unsafe_allow_html=True)
-    for news_item in st.session_state.news_ticker:
-        st.markdown(f"<p>• {news_item}</p>", unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    items_html = "".join(_NEWS_ITEM_TPL.substitute(item=news_item) for news_item in st.session_state.news_ticker)
+    st.markdown(f'<div class="news-ticker"><h4>Haber Akışı</h4>{items_html}</div>', unsafe_allow_html=True)
+
+# Shared chart styling, applied via the Altair theme and the raw Vega-Lite spec alike
+_CHART_CONFIG = {"title": {"fontSize": 16, "anchor": "middle"}, "view": {"stroke": None}}
+
+@st.cache_resource
+def _load_altair():
+    """Imports altair on first use and registers the app's chart theme once per process."""
+    import altair as alt
+
+    @alt.theme.register("cio", enable=True)
+    def _cio_theme():
+        return alt.theme.ThemeConfig({"config": _CHART_CONFIG})
+
+    return alt
+
+# Metric tuples are practically unique per report and the cache is shared by all sessions
+@st.cache_data(max_entries=64)
+def _build_report_chart(prev_tuple: tuple, cur_tuple: tuple) -> "alt.Chart":
+    """Builds the start-vs-end bar chart for a crisis report; cached on the metric value tuples (METRIC_KEYS order)."""
+    # pandas/altair are only needed once a report is shown, so keep them off the cold-start path
+    import pandas as pd
+    alt = _load_altair()
+
+    n = len(METRIC_KEYS)
+
+    # Build the long-form frame directly (all 'Başlangıç' rows, then all 'Son' rows) instead of melting a wide one
+    report_df_melted = pd.DataFrame({
+        'Gösterge': np.tile(np.array(METRIC_LABELS), 2),
+        'Durum': np.repeat(np.array(['Başlangıç', 'Son']), n),
+        'Değer': np.concatenate((
+            np.fromiter(prev_tuple, dtype=np.float64, count=n),
+            np.fromiter(cur_tuple, dtype=np.float64, count=n)
+        ))
+    })
+    
+    return alt.Chart(report_df_melted).mark_bar().encode(
+        x=alt.X('Durum:N', title=None, axis=alt.Axis(labels=True, ticks=False, domain=False)),
+        y=alt.Y('Değer:Q', title='Puan', scale=alt.Scale(domain=[0, 100])),
+        color=alt.Color('Durum:N', title='Durum', scale=alt.Scale(domain=['Başlangıç', 'Son'], range=['#00ffff', '#ff00ff'])),
+        column=alt.Column('Gösterge:N', title='Metrikler', header=alt.Header(labelOrient='bottom', titleOrient='bottom'))
+    ).properties(width=alt.Step(40), title='Metriklerin Başlangıç ve Son Değerleri')
+
+# Hand-written Vega-Lite spec for the end-of-game history chart (data is passed separately)
+_HISTORY_CHART_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": {"field": "Kriz", "type": "ordinal", "sort": None, "title": "Aşama"},
+        "y": {"field": "Değer", "type": "quantitative", "title": "Puan", "scale": {"domain": [0, 100]}},
+        "color": {"field": "Gösterge", "type": "nominal", "title": "Metrikler", "scale": {"scheme": "viridis"}},
+        "tooltip": [
+            {"field": "Kriz", "type": "ordinal"},
+            {"field": "Gösterge", "type": "nominal"},
+            {"field": "Değer", "type": "quantitative", "format": ".1f"},
+        ],
+    },
+    "title": "Krizler Boyunca Metrik Değişimleri",
+    "height": 400,
+    "config": _CHART_CONFIG,
+}
+
+# Keyed on one game's history, so without a bound every finished game would stay cached
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_history_df(history_columns: tuple) -> "pd.DataFrame":
+    """Builds the long-form frame for the end-of-game history chart; cached on the raw float32 column bytes (METRIC_KEYS order)."""
+    import pandas as pd
+
+    # Columns are labelled with display names up front, so no metric filtering or renaming is needed after melt
+    history_df = pd.DataFrame({label: np.frombuffer(column, dtype=np.float32) for label, column in zip(METRIC_LABELS, history_columns)})
+    history_df['Kriz'] = np.array(["Oyun Başlangıcı"] + [f"Kriz {i} Başlangıcı" for i in range(2, len(history_df) + 1)])
+    
+    history_df = history_df.melt(id_vars=['Kriz'], var_name='Gösterge', value_name='Değer')
+
+    # Compact dtypes keep the Arrow payload sent to the browser small
+    history_df['Kriz'] = pd.Categorical(history_df['Kriz'])
+    history_df['Gösterge'] = pd.Categorical(history_df['Gösterge'])
+    return history_df
 
 
 # --- SCREEN RENDERERS ---
 # Functions responsible for drawing each screen of the game.
 
+_DURATION_MAP = {'Kısa': 'short', 'Orta': 'medium', 'Uzun': 'long'}
+
 def start_game_screen():
     st.title("🛡️ CIO Kriz Yönetimi Oyunu")
     st.markdown("""
@@ -365,7 +545,7 @@ def start_game_screen():
         random.shuffle(crisis_keys)
         st.session_state.crisis_sequence = crisis_keys[:st.session_state.max_crises]
         st.session_state.current_crisis_index = 0
-        st.session_state.crisis_history.append(st.session_state.metrics.copy())
+        record_history(st.session_state.metrics)
         st.session_state.selected_scenario_id = st.session_state.crisis_sequence[0]
         st.session_state.screen = 'story'
         st.rerun()
@@ -374,18 +554,8 @@ def story_screen():
     scenario = get_scenarios()[st.session_state.selected_scenario_id]
     st.title(f"{scenario.icon} Kriz {st.session_state.current_crisis_index + 1}: {scenario.title}")
 
-    try:
-        report_part, mission_part = scenario.story.split("**Görev**:")
-    except ValueError:
-        report_part = scenario.story
-        mission_part = ""
-
-    st.markdown(f'<div class="crisis-card">{report_part}</div>', unsafe_allow_html=True)
-    st.markdown(f'''
-        <div class="crisis-card" style="border-left: 5px solid #ff00ff;">
-            <h4>Görev</h4><hr><p>{mission_part}</p>
-        </div>
-    ''', unsafe_allow_html=True)
+    st.markdown(_CRISIS_CARD_TPL.substitute(body=scenario.report_part), unsafe_allow_html=True)
+    st.markdown(_MISSION_TPL.substitute(mission=scenario.mission_part), unsafe_allow_html=True)
     
     st.write("")
     display_guidance("Kararlarınız can güvenliğini artırabilir, ancak özgürlükleri ve halkın güvenini etkileyebilir. Dengeyi bulmaya hazır mısınız?")
@@ -402,11 +572,7 @@ def advisors_screen():
     cols = st.columns(len(scenario.advisors))
     for i, advisor in enumerate(scenario.advisors):
         with cols[i]:
-            st.markdown(f"""
-            <div class="crisis-card">
-                <h5>{advisor.name}</h5><hr><p>{advisor.text}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_ADVISOR_TPL.substitute(name=advisor.name, text=advisor.text), unsafe_allow_html=True)
 
     display_guidance("Her danışmanın önerisi farklı bir strateji sunuyor. Önyargılarına dikkat edin ve uzun vadeli etkileri düşünün!")
 
@@ -426,9 +592,9 @@ def decision_screen():
         </div>
     """, unsafe_allow_html=True)
 
-    affordable_actions = [card for card in scenario.action_cards if st.session_state.budget >= card.cost and st.session_state.human_resources >= card.hr_cost]
+    has_affordable_action = any(st.session_state.budget >= card.cost and st.session_state.human_resources >= card.hr_cost for card in scenario.action_cards)
 
-    if not affordable_actions:
+    if not has_affordable_action:
         st.warning("Kaynaklarınız yetersiz! Hiçbir politikayı uygulayacak bütçeniz veya insan kaynağınız kalmadı.")
         if st.button("Turu Atla (Negatif Sonuçlar Doğurur)"):
             results = calculate_skip_turn_effects()
@@ -475,11 +641,11 @@ def decision_screen():
                 st.markdown('</div>', unsafe_allow_html=True)
 
             if st.button("Uygula"):
-                action = next(card for card in scenario.action_cards if card.id == selected_action_id)
+                action = scenario.action_cards_by_id[selected_action_id]
                 
                 st.session_state.decision.update({
                     'scope': 'targeted' if scope == "Hedefli" else 'general',
-                    'duration': {'Kısa': 'short', 'Orta': 'medium', 'Uzun': 'long'}[duration],
+                    'duration': _DURATION_MAP[duration],
                     'safeguards': safeguards,
                     'skipped': False
                 })
@@ -501,7 +667,7 @@ def immediate_screen():
         immediate_text = "Kaynak yetersizliği nedeniyle hükümet krize müdahale edemedi. Bu durum, krizin etkilerini derinleştirdi ve halk arasında endişeye yol açtı."
     else:
         scenario = get_scenarios()[st.session_state.selected_scenario_id]
-        action_name = next(card.name for card in scenario.action_cards if card.id == st.session_state.decision['action'])
+        action_name = scenario.action_cards_by_id[st.session_state.decision['action']].name
         immediate_text = scenario.immediate_text.format(f"<b>{action_name}</b>")
     
     st.markdown(f"""
@@ -509,9 +675,9 @@ def immediate_screen():
             <h3>Olay Günlüğü</h3><p>{immediate_text}</p>
             <h4>Durum Güncellemesi</h4>
             <ul>
-                <li><strong>Güvenlik</strong>: <span class="{'metric-positive' if results['security'] > old_metrics['security'] else 'metric-negative'}">{results['security']:.1f}</span> – Krizin acil etkileri hafifledi.</li>
-                <li><strong>Özgürlük</strong>: <span class="{'metric-positive' if results['freedom'] > old_metrics['freedom'] else 'metric-negative'}">{results['freedom']:.1f}</span> – Kapsam ve süre özgürlükleri etkiledi.</li>
-                <li><strong>Kamu Güveni</strong>: <span class="{'metric-positive' if results['public_trust'] > old_metrics['public_trust'] else 'metric-negative'}">{results['public_trust']:.1f}</span> – Şeffaflık tepkileri şekillendirdi.</li>
+                <li><strong>Güvenlik</strong>: <span class="{'metric-positive' if results['security'] > old_metrics[SECURITY] else 'metric-negative'}">{results['security']:.1f}</span> – Krizin acil etkileri hafifledi.</li>
+                <li><strong>Özgürlük</strong>: <span class="{'metric-positive' if results['freedom'] > old_metrics[FREEDOM] else 'metric-negative'}">{results['freedom']:.1f}</span> – Kapsam ve süre özgürlükleri etkiledi.</li>
+                <li><strong>Kamu Güveni</strong>: <span class="{'metric-positive' if results['public_trust'] > old_metrics[TRUST] else 'metric-negative'}">{results['public_trust']:.1f}</span> – Şeffaflık tepkileri şekillendirdi.</li>
             </ul>
         </div>
     """, unsafe_allow_html=True)
@@ -522,11 +688,11 @@ def immediate_screen():
 
 def delayed_screen():
     current_results = st.session_state.results
+    long_term_gain = 10 if st.session_state.decision.get('action') == 'C' else 5
+    trust_erosion = 3 if draw_uniform() > 0.7 else 0
     delayed_results = {
         **current_results,
-        'security': min(100, current_results['security'] + (10 if st.session_state.decision.get('action') == 'C' else 5)),
-        'resilience': min(100, current_results['resilience'] + (10 if st.session_state.decision.get('action') == 'C' else 5)),
-        'public_trust': min(100, max(0, current_results['public_trust'] - (3 if random.random() > 0.7 else 0)))
+        **metrics_dict(apply_metric_deltas(metrics_vector(current_results), [long_term_gain, 0, -trust_erosion, long_term_gain, 0]))
     }
     st.session_state.results = delayed_results
 
@@ -556,30 +722,14 @@ def delayed_screen():
         st.rerun()
 
 def report_screen():
-    st.session_state.metrics = st.session_state.results.copy()
+    st.session_state.metrics = metrics_vector(st.session_state.results)
     st.title(f"Kriz {st.session_state.current_crisis_index + 1} Sonu Raporu")
     
     st.markdown('<div class="crisis-card"><h3>Sonuçlar</h3>', unsafe_allow_html=True)
-    previous_metrics = st.session_state.crisis_history[st.session_state.current_crisis_index]
+    previous_metrics = history_snapshot(st.session_state.current_crisis_index)
     current_metrics = st.session_state.metrics
 
-    df = pd.DataFrame([
-        {'Gösterge': 'Güvenlik', 'Başlangıç': previous_metrics['security'], 'Son': current_metrics['security']},
-        {'Gösterge': 'Özgürlük', 'Başlangıç': previous_metrics['freedom'], 'Son': current_metrics['freedom']},
-        {'Gösterge': 'Kamu Güveni', 'Başlangıç': previous_metrics['public_trust'], 'Son': current_metrics['public_trust']},
-        {'Gösterge': 'Dayanıklılık', 'Başlangıç': previous_metrics['resilience'], 'Son': current_metrics['resilience']},
-        {'Gösterge': 'Uyum Yorgunluğu', 'Başlangıç': previous_metrics['fatigue'], 'Son': current_metrics['fatigue']}
-    ])
-    
-    report_df_melted = df.melt(id_vars=['Gösterge'], value_vars=['Başlangıç', 'Son'], var_name='Durum', value_name='Değer')
-    
-    bar_chart = alt.Chart(report_df_melted).mark_bar().encode(
-        x=alt.X('Durum:N', title=None, axis=alt.Axis(labels=True, ticks=False, domain=False)),
-        y=alt.Y('Değer:Q', title='Puan', scale=alt.Scale(domain=[0, 100])),
-        color=alt.Color('Durum:N', title='Durum', scale=alt.Scale(domain=['Başlangıç', 'Son'], range=['#00ffff', '#ff00ff'])),
-        column=alt.Column('Gösterge:N', title='Metrikler', header=alt.Header(labelOrient='bottom', titleOrient='bottom'))
-    ).properties(width=alt.Step(40), title='Metriklerin Başlangıç ve Son Değerleri').configure_title(fontSize=16, anchor='middle').configure_view(stroke=None)
-    
+    bar_chart = _build_report_chart(tuple(previous_metrics.tolist()), tuple(current_metrics.tolist()))
     st.altair_chart(bar_chart, use_container_width=False)
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -605,7 +755,7 @@ def report_screen():
 
     if st.button("Sonraki Krize Geç"):
         st.session_state.current_crisis_index += 1
-        st.session_state.crisis_history.append(st.session_state.metrics.copy())
+        record_history(st.session_state.metrics)
 
         if st.session_state.current_crisis_index < len(st.session_state.crisis_sequence):
             st.session_state.selected_scenario_id = st.session_state.crisis_sequence[st.session_state.current_crisis_index]
@@ -648,23 +798,8 @@ def game_end_screen():
         </div>
     """, unsafe_allow_html=True)
 
-    history_df = pd.DataFrame(st.session_state.crisis_history)
-    history_df['Kriz'] = [f"Kriz {i+1} Başlangıcı" for i in range(len(history_df))]
-    history_df.loc[0, 'Kriz'] = "Oyun Başlangıcı"
-    
-    history_df = history_df.melt(id_vars=['Kriz'], var_name='Gösterge', value_name='Değer')
-    metric_map = {'security': 'Güvenlik', 'freedom': 'Özgürlük', 'public_trust': 'Kamu Güveni', 'resilience': 'Dayanıklılık', 'fatigue': 'Uyum Yorgunluğu'}
-    history_df = history_df[history_df['Gösterge'].isin(metric_map.keys())]
-    history_df['Gösterge'] = history_df['Gösterge'].replace(metric_map)
-    
-    line_chart = alt.Chart(history_df).mark_line(point=True).encode(
-        x=alt.X('Kriz:O', sort=None, title='Aşama'),
-        y=alt.Y('Değer:Q', title='Puan', scale=alt.Scale(domain=[0, 100])),
-        color=alt.Color('Gösterge:N', title='Metrikler', scale=alt.Scale(scheme='viridis')),
-        tooltip=['Kriz', 'Gösterge', alt.Tooltip('Değer:Q', format='.1f')]
-    ).properties(title='Krizler Boyunca Metrik Değişimleri', height=400).configure_title(fontSize=16, anchor='middle').configure_view(stroke=None)
-    
-    st.altair_chart(line_chart, use_container_width=True)
+    history_columns = tuple(st.session_state.crisis_history[key].tobytes() for key in METRIC_KEYS)
+    st.vega_lite_chart(data=_build_history_df(history_columns), spec=_HISTORY_CHART_SPEC, use_container_width=True)
 
     if st.button("Yeni Oyun Başlat"):
         reset_game()
@@ -673,21 +808,26 @@ def game_end_screen():
 initialize_game_state()
 display_metrics_sidebar()
 
-screen_functions = {
-    'start_game': start_game_screen,
-    'story': story_screen,
-    'advisors': advisors_screen,
-    'decision': decision_screen,
-    'immediate': immediate_screen,
-    'delayed': delayed_screen,
-    'report': report_screen,
-    'game_end': game_end_screen,
-}
+# The script re-executes on every rerun, so dispatch with match rather than rebuilding a lookup dict
+match st.session_state.screen:
+    case 'start_game':
+        start_game_screen()
+    case 'story':
+        story_screen()
+    case 'advisors':
+        advisors_screen()
+    case 'decision':
+        decision_screen()
+    case 'immediate':
+        immediate_screen()
+    case 'delayed':
+        delayed_screen()
+    case 'report':
+        report_screen()
+    case 'game_end':
+        game_end_screen()
+    case _:
+        st.error("Bir hata oluştu. Oyun yeniden başlatılıyor.")
+        reset_game()
 
-current_screen_func = screen_functions.get(st.session_state.screen)
-if current_screen_func:
-    current_screen_func()
-    display_help_guide()
-else:
-    st.error("Bir hata oluştu. Oyun yeniden başlatılıyor.")
-    reset_game()
+display_help_guide()
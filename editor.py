@@ -1,9 +1,10 @@
 import streamlit as st
-import json
+import orjson
 from pathlib import Path
 import datetime
 import os
 import shutil
+import tempfile
 import zipfile
 import io
 
@@ -15,50 +16,82 @@ CONFIG_FILE = Path("config.json")
 
 # --- HELPER FUNCTIONS ---
 
-def load_data(file_path: Path):
-    """Loads data from a JSON file."""
+def file_mtime(file_path: Path) -> int:
+    """Returns the file's modification time in nanoseconds, or 0 if it doesn't exist."""
+    return file_path.stat().st_mtime_ns if file_path.exists() else 0
+
+@st.cache_data(max_entries=4)
+def load_data(path_str: str, mtime: int):
+    """Loads data from a JSON file. Cached per (path, mtime), so a save invalidates it automatically;
+    max_entries drops superseded versions instead of keeping one per save."""
+    file_path = Path(path_str)
     if file_path.exists():
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return orjson.loads(file_path.read_bytes())
     return {}
 
 def save_data(file_path: Path, data):
-    """Saves data to a JSON file with pretty printing."""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Saves data to a JSON file atomically, via a uniquely named temp file and os.replace."""
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=file_path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        if file_path.exists():
+            shutil.copymode(file_path, tmp_name)  # mkstemp creates the file as 0600
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+# Built and serialized once; get_default_scenario parses a fresh copy per call
+_DEFAULT_SCENARIO_TEMPLATE = {
+    "title": "Yeni Senaryo Başlığı",
+    "icon": "✨",
+    "story": "Buraya krizin hikayesini yazın. **Görev**: Oyuncunun görevini buraya yazın.",
+    "advisors": [
+        {"name": "Danışman 1 (Örn: Güvenlik)", "text": "Danışman görüşünü buraya yazın."},
+        {"name": "Danışman 2 (Örn: Hukuk)", "text": "Danışman görüşünü buraya yazın."},
+        {"name": "Danışman 3 (Örn: Siyaset)", "text": "Danışman görüşünü buraya yazın."},
+        {"name": "Danışman 4 (Örn: Teknik)", "text": "Danışman görüşünü buraya yazın."}
+    ],
+    "action_cards": [
+        {
+            "id": "A", "name": "Aksiyon Kartı A", "cost": 30, "hr_cost": 10, "speed": "fast",
+            "security_effect": 40, "freedom_cost": 30, "side_effect_risk": 0.4,
+            "safeguard_reduction": 0.5, "tooltip": "Hızlı ama riskli bir seçenek."
+        },
+        {
+            "id": "B", "name": "Aksiyon Kartı B", "cost": 20, "hr_cost": 15, "speed": "medium",
+            "security_effect": 30, "freedom_cost": 15, "side_effect_risk": 0.2,
+            "safeguard_reduction": 0.7, "tooltip": "Dengeli bir seçenek."
+        },
+        {
+            "id": "C", "name": "Aksiyon Kartı C", "cost": 15, "hr_cost": 20, "speed": "slow",
+            "security_effect": 20, "freedom_cost": 5, "side_effect_risk": 0.1,
+            "safeguard_reduction": 0.8, "tooltip": "Yavaş ama güvenli bir seçenek."
+        }
+    ],
+    "immediate_text": "Anlık etki metnini buraya yazın. Seçilen aksiyonu göstermek için {} kullanın.",
+    "delayed_text": "Gecikmeli etki metnini buraya yazın."
+}
+_DEFAULT_SCENARIO_JSON = orjson.dumps(_DEFAULT_SCENARIO_TEMPLATE)
 
 def get_default_scenario(title="Yeni Senaryo Başlığı"):
     """Returns a dictionary with a default structure for a new scenario."""
-    return {
-        "title": title,
-        "icon": "✨",
-        "story": "Buraya krizin hikayesini yazın. **Görev**: Oyuncunun görevini buraya yazın.",
-        "advisors": [
-            {"name": "Danışman 1 (Örn: Güvenlik)", "text": "Danışman görüşünü buraya yazın."},
-            {"name": "Danışman 2 (Örn: Hukuk)", "text": "Danışman görüşünü buraya yazın."},
-            {"name": "Danışman 3 (Örn: Siyaset)", "text": "Danışman görüşünü buraya yazın."},
-            {"name": "Danışman 4 (Örn: Teknik)", "text": "Danışman görüşünü buraya yazın."}
-        ],
-        "action_cards": [
-            {
-                "id": "A", "name": "Aksiyon Kartı A", "cost": 30, "hr_cost": 10, "speed": "fast",
-                "security_effect": 40, "freedom_cost": 30, "side_effect_risk": 0.4,
-                "safeguard_reduction": 0.5, "tooltip": "Hızlı ama riskli bir seçenek."
-            },
-            {
-                "id": "B", "name": "Aksiyon Kartı B", "cost": 20, "hr_cost": 15, "speed": "medium",
-                "security_effect": 30, "freedom_cost": 15, "side_effect_risk": 0.2,
-                "safeguard_reduction": 0.7, "tooltip": "Dengeli bir seçenek."
-            },
-            {
-                "id": "C", "name": "Aksiyon Kartı C", "cost": 15, "hr_cost": 20, "speed": "slow",
-                "security_effect": 20, "freedom_cost": 5, "side_effect_risk": 0.1,
-                "safeguard_reduction": 0.8, "tooltip": "Yavaş ama güvenli bir seçenek."
-            }
-        ],
-        "immediate_text": "Anlık etki metnini buraya yazın. Seçilen aksiyonu göstermek için {} kullanın.",
-        "delayed_text": "Gecikmeli etki metnini buraya yazın."
-    }
+    scenario = orjson.loads(_DEFAULT_SCENARIO_JSON)
+    scenario["title"] = title
+    return scenario
+
+@st.cache_data(max_entries=1)
+def _build_backup_zip(scenarios_mtime: int, config_mtime: int) -> bytes:
+    """Zips scenarios.json and config.json in memory. Cached on their mtimes, so it's rebuilt only when they change."""
+    zip_buffer = io.BytesIO()
+    # Two small JSON files: storing them uncompressed costs less than running zlib over them
+    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_STORED, False) as zip_file:
+        if SCENARIOS_FILE.exists():
+            zip_file.writestr(SCENARIOS_FILE.name, SCENARIOS_FILE.read_bytes())
+        if CONFIG_FILE.exists():
+            zip_file.writestr(CONFIG_FILE.name, CONFIG_FILE.read_bytes())
+    return zip_buffer.getvalue()
 
 # --- UI SECTIONS ---
 
@@ -67,24 +100,17 @@ def backup_and_restore_ui():
     st.sidebar.title("🗄️ Yedekleme & Geri Yükleme")
 
     # --- Create and Download Backup ---
-    st.sidebar.subheader("Yedek İndir")
-    
-    # Create zip in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
-        if SCENARIOS_FILE.exists():
-            zip_file.writestr(SCENARIOS_FILE.name, SCENARIOS_FILE.read_bytes())
-        if CONFIG_FILE.exists():
-            zip_file.writestr(CONFIG_FILE.name, CONFIG_FILE.read_bytes())
-    
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
-    st.sidebar.download_button(
-        label="Mevcut Yapılandırmayı İndir (.zip)",
-        data=zip_buffer.getvalue(),
-        file_name=f"cio_game_backup_{timestamp}.zip",
-        mime="application/zip",
-        use_container_width=True
-    )
+    # Expander bodies run on every rerun, so the toggle is what keeps the ZIP work off the hot path
+    with st.sidebar.expander("Yedek İndir", expanded=False):
+        if st.toggle("Yedek dosyasını hazırla", key="prepare_backup"):
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
+            st.download_button(
+                label="Mevcut Yapılandırmayı İndir (.zip)",
+                data=_build_backup_zip(file_mtime(SCENARIOS_FILE), file_mtime(CONFIG_FILE)),
+                file_name=f"cio_game_backup_{timestamp}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
 
     # --- Restore from Backup ---
     st.sidebar.subheader("Yedekten Geri Yükle")
@@ -93,6 +119,12 @@ def backup_and_restore_ui():
     )
 
     if uploaded_file is not None:
+        # The uploader keeps the file across reruns; restore each upload only once.
+        # file_id is unique per upload, so re-uploading the same backup still restores it.
+        if uploaded_file.file_id == st.session_state.get("_restored_file_id"):
+            st.sidebar.info("Bu yedek zaten geri yüklendi.")
+            return
+
         try:
             with zipfile.ZipFile(uploaded_file, 'r') as zip_ref:
                 # Check for required files in zip
@@ -104,11 +136,12 @@ def backup_and_restore_ui():
                     st.sidebar.error("Yüklenen ZIP dosyası 'scenarios.json' ve 'config.json' dosyalarını içermiyor.")
                 else:
                     # Extract and save
-                    scenarios_data = json.loads(zip_ref.read(SCENARIOS_FILE.name))
-                    config_data = json.loads(zip_ref.read(CONFIG_FILE.name))
+                    scenarios_data = orjson.loads(zip_ref.read(SCENARIOS_FILE.name))
+                    config_data = orjson.loads(zip_ref.read(CONFIG_FILE.name))
                     
                     save_data(SCENARIOS_FILE, scenarios_data)
                     save_data(CONFIG_FILE, config_data)
+                    st.session_state["_restored_file_id"] = uploaded_file.file_id
                     
                     st.sidebar.success("Yedek başarıyla geri yüklendi!")
                     st.sidebar.info("Değişiklikleri görmek için sayfayı yenileyin.")
@@ -206,52 +239,80 @@ def edit_scenarios(scenarios_data):
 
     if not scenarios_data:
         st.warning("Hiç senaryo bulunamadı. Lütfen kenar çubuğundan bir tane ekleyin.")
-        return {}
+        return
 
-    scenario_titles = {data.get('title', f"ID: {key}"): key for key, data in scenarios_data.items()}
-    sorted_titles = sorted(scenario_titles.keys())
-    selected_title = st.selectbox("Düzenlenecek Senaryoyu Seçin", options=sorted_titles)
+    scenario_titles = {key: data.get('title', f"ID: {key}") for key, data in scenarios_data.items()}
+    sorted_keys = sorted(scenario_titles, key=scenario_titles.get)
+    # "Uygula" saves immediately, so a rename changes the labels; select by id under a
+    # stable key, and carry its value over in case the relabelled widget is rebuilt
+    if st.session_state.get("_edit_selected_key") in scenario_titles:
+        st.session_state["_edit_selected_key"] = st.session_state["_edit_selected_key"]
+    else:
+        st.session_state.pop("_edit_selected_key", None)
+    selected_key = st.selectbox(
+        "Düzenlenecek Senaryoyu Seçin",
+        options=sorted_keys,
+        format_func=scenario_titles.get,
+        key="_edit_selected_key"
+    )
     
-    if not selected_title:
-        return scenarios_data
+    if not selected_key:
+        return
 
-    selected_key = scenario_titles[selected_title]
     scenario = scenarios_data[selected_key]
 
-    st.subheader(f"'{scenario.get('title', '')}' Senaryosunu Düzenle")
-    scenario['title'] = st.text_input("Başlık", value=scenario.get('title', ''), key=f"title_{selected_key}")
-    scenario['icon'] = st.text_input("İkon (Emoji)", value=scenario.get('icon', ''), max_chars=2, key=f"icon_{selected_key}")
-    scenario['story'] = st.text_area("Hikaye", value=scenario.get('story', ''), height=200, key=f"story_{selected_key}")
-    scenario['immediate_text'] = st.text_area("Anlık Etki Metni", value=scenario.get('immediate_text', ''), height=100, key=f"imm_text_{selected_key}")
-    scenario['delayed_text'] = st.text_area("Gecikmeli Etki Metni", value=scenario.get('delayed_text', ''), height=100, key=f"del_text_{selected_key}")
-
-    st.subheader("Danışmanlar")
-    for i, advisor in enumerate(scenario.get("advisors", [])):
-        with st.container(border=True):
-            st.markdown(f"**Danışman {i+1}**")
-            advisor['name'] = st.text_input("Danışman Adı", value=advisor.get('name', ''), key=f"adv_name_{selected_key}_{i}")
-            advisor['text'] = st.text_area("Danışman Metni", value=advisor.get('text', ''), key=f"adv_text_{selected_key}_{i}", height=150)
-
-    st.subheader("Aksiyon Kartları")
-    for i, card in enumerate(scenario.get("action_cards", [])):
-        with st.container(border=True):
-            st.markdown(f"**Aksiyon Kartı {i+1} ({card.get('id', '')})**")
-            card['name'] = st.text_input("Kart Adı", value=card.get('name', ''), key=f"card_name_{selected_key}_{i}")
-            card['tooltip'] = st.text_area("İpucu Metni", value=card.get('tooltip', ''), key=f"card_tooltip_{selected_key}_{i}")
-            
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                card['cost'] = st.number_input("Maliyet (Bütçe)", value=card.get('cost', 0), key=f"card_cost_{selected_key}_{i}")
-                card['hr_cost'] = st.number_input("Maliyet (İnsan Kaynağı)", value=card.get('hr_cost', 0), key=f"card_hr_{selected_key}_{i}")
-            with c2:
-                card['security_effect'] = st.slider("Güvenlik Etkisi", 0, 100, value=card.get('security_effect', 0), key=f"card_sec_{selected_key}_{i}")
-                card['freedom_cost'] = st.slider("Özgürlük Maliyeti", 0, 100, value=card.get('freedom_cost', 0), key=f"card_free_{selected_key}_{i}")
-            with c3:
-                card['side_effect_risk'] = st.slider("Yan Etki Riski", 0.0, 1.0, value=card.get('side_effect_risk', 0.0), format="%.2f", key=f"card_risk_{selected_key}_{i}")
-                card['safeguard_reduction'] = st.slider("Güvence Azaltma Etkisi", 0.0, 1.0, value=card.get('safeguard_reduction', 0.0), format="%.2f", key=f"card_safe_{selected_key}_{i}")
-
-    scenarios_data[selected_key] = scenario
-    return scenarios_data
+    # Batch all edits into a single rerun on submit instead of one rerun per keystroke
+    with st.form(key=f"edit_{selected_key}"):
+        st.subheader(f"'{scenario.get('title', '')}' Senaryosunu Düzenle")
+        title = st.text_input("Başlık", value=scenario.get('title', ''), key=f"title_{selected_key}")
+        icon = st.text_input("İkon (Emoji)", value=scenario.get('icon', ''), max_chars=2, key=f"icon_{selected_key}")
+        story = st.text_area("Hikaye", value=scenario.get('story', ''), height=200, key=f"story_{selected_key}")
+        immediate_text = st.text_area("Anlık Etki Metni", value=scenario.get('immediate_text', ''), height=100, key=f"imm_text_{selected_key}")
+        delayed_text = st.text_area("Gecikmeli Etki Metni", value=scenario.get('delayed_text', ''), height=100, key=f"del_text_{selected_key}")
+
+        st.subheader("Danışmanlar")
+        advisor_updates = []
+        for i, advisor in enumerate(scenario.get("advisors", [])):
+            with st.container(border=True):
+                st.markdown(f"**Danışman {i+1}**")
+                advisor_updates.append({
+                    'name': st.text_input("Danışman Adı", value=advisor.get('name', ''), key=f"adv_name_{selected_key}_{i}"),
+                    'text': st.text_area("Danışman Metni", value=advisor.get('text', ''), key=f"adv_text_{selected_key}_{i}", height=150)
+                })
+
+        st.subheader("Aksiyon Kartları")
+        card_updates = []
+        for i, card in enumerate(scenario.get("action_cards", [])):
+            with st.container(border=True):
+                st.markdown(f"**Aksiyon Kartı {i+1} ({card.get('id', '')})**")
+                update = {
+                    'name': st.text_input("Kart Adı", value=card.get('name', ''), key=f"card_name_{selected_key}_{i}"),
+                    'tooltip': st.text_area("İpucu Metni", value=card.get('tooltip', ''), key=f"card_tooltip_{selected_key}_{i}")
+                }
+                
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    update['cost'] = st.number_input("Maliyet (Bütçe)", value=card.get('cost', 0), key=f"card_cost_{selected_key}_{i}")
+                    update['hr_cost'] = st.number_input("Maliyet (İnsan Kaynağı)", value=card.get('hr_cost', 0), key=f"card_hr_{selected_key}_{i}")
+                with c2:
+                    update['security_effect'] = st.slider("Güvenlik Etkisi", 0, 100, value=card.get('security_effect', 0), key=f"card_sec_{selected_key}_{i}")
+                    update['freedom_cost'] = st.slider("Özgürlük Maliyeti", 0, 100, value=card.get('freedom_cost', 0), key=f"card_free_{selected_key}_{i}")
+                with c3:
+                    update['side_effect_risk'] = st.slider("Yan Etki Riski", 0.0, 1.0, value=card.get('side_effect_risk', 0.0), format="%.2f", key=f"card_risk_{selected_key}_{i}")
+                    update['safeguard_reduction'] = st.slider("Güvence Azaltma Etkisi", 0.0, 1.0, value=card.get('safeguard_reduction', 0.0), format="%.2f", key=f"card_safe_{selected_key}_{i}")
+                card_updates.append(update)
+
+        submitted = st.form_submit_button("Uygula")
+
+    if submitted:
+        scenario.update(title=title, icon=icon, story=story, immediate_text=immediate_text, delayed_text=delayed_text)
+        for advisor, update in zip(scenario.get("advisors", []), advisor_updates):
+            advisor.update(update)
+        for card, update in zip(scenario.get("action_cards", []), card_updates):
+            card.update(update)
+        # Data is reloaded from disk on every rerun, so persist now or the edits are lost
+        save_data(SCENARIOS_FILE, scenarios_data)
+        st.success(f"'{title}' senaryosundaki değişiklikler kaydedildi!")
 
 # --- MAIN APP ---
 
@@ -263,20 +324,17 @@ def main():
     if 'mode' not in st.session_state:
         st.session_state.mode = 'edit'
 
-    scenarios_data = load_data(SCENARIOS_FILE)
-    config_data = load_data(CONFIG_FILE)
+    scenarios_data = load_data(str(SCENARIOS_FILE), file_mtime(SCENARIOS_FILE))
+    config_data = load_data(str(CONFIG_FILE), file_mtime(CONFIG_FILE))
 
     # --- Sidebar for Actions ---
     st.sidebar.title("İşlemler")
     if st.sidebar.button("📝 Senaryoları Düzenle/Görüntüle", use_container_width=True):
         st.session_state.mode = 'edit'
-        st.rerun()
     if st.sidebar.button("➕ Yeni Senaryo Ekle", use_container_width=True):
         st.session_state.mode = 'add'
-        st.rerun()
     if st.sidebar.button("🗑️ Senaryo Sil", use_container_width=True):
         st.session_state.mode = 'delete'
-        st.rerun()
     
     st.sidebar.title("Kaydet")
     if st.sidebar.button("Tüm Değişiklikleri Kaydet", type="primary", use_container_width=True):
@@ -299,8 +357,7 @@ def main():
     else: # Default to 'edit'
         col1, col2 = st.columns(2)
         with col1:
-            updated_scenarios = edit_scenarios(scenarios_data)
-            scenarios_data = updated_scenarios # Store updates
+            edit_scenarios(scenarios_data) # Edits are applied to scenarios_data in place
         with col2:
             updated_config = edit_game_balance(config_data)
             config_data = updated_config # Store updates